@@ -29,6 +29,8 @@ class Node(abc.ABC):
     """
     Abstract class used for a Node in graph
     """
+    __slots__ = ()
+
     @abc.abstractmethod
     def __init__(self):
         pass
@@ -38,6 +40,8 @@ class Cost(abc.ABC):
     """
     Abstract class used to compute costs in a graph
     """
+    __slots__ = ('_ancestor',)
+
     @abc.abstractmethod
     def __add__(self, other: Node):
         pass
@@ -133,8 +137,8 @@ class DirectedGraph(Graph):
         :return: set of start nodes
         :rtype: Set[Node]
         """
-        left_nodes, right_nodes = zip(*list(self))
-        return set(left_nodes) - set(right_nodes)
+        left_nodes, right_nodes = self._edge_sides()
+        return left_nodes - right_nodes
 
     @property
     def end_nodes(self):
@@ -143,8 +147,21 @@ class DirectedGraph(Graph):
         :return: set of end nodes
         :rtype: Set[Node]
         """
-        left_nodes, right_nodes = zip(*list(self))
-        return set(right_nodes) - set(left_nodes)
+        left_nodes, right_nodes = self._edge_sides()
+        return right_nodes - left_nodes
+
+    def _edge_sides(self) -> Tuple[Set[Node], Set[Node]]:
+        """
+        Returns the set of nodes appearing on the left side of an edge and the set of nodes appearing on the right
+        side of an edge
+        :return: 2-tuple of sets of nodes (left nodes, right nodes)
+        :rtype: Tuple[Set[Node], Set[Node]]
+        """
+        left_nodes, right_nodes = set(), set()
+        for input_node, output_node in self:
+            left_nodes.add(input_node)
+            right_nodes.add(output_node)
+        return left_nodes, right_nodes
 
     @property
     def transition_rules(self) -> Callable:
@@ -212,12 +229,10 @@ class DirectedGraph(Graph):
         to_skip = set()
         for i_t1 in range(len(chain_sequences)):
             if i_t1 in to_skip: continue
-            t1_flat = set(chain(*chain_sequences[i_t1]))
+            t1_flat = set(chain.from_iterable(chain_sequences[i_t1]))
             for i_t2 in range(i_t1 + 1, len(chain_sequences)):
-                t2_flat = set(chain(*chain_sequences[i_t2]))
-
-                # Two chains are connected if their share one node
-                if len(t1_flat.intersection(t2_flat)):
+                # Two chains are connected if their share one node (stops at the first shared node)
+                if not t1_flat.isdisjoint(chain.from_iterable(chain_sequences[i_t2])):
                     chain_sequences[i_t1] = chain_sequences[i_t1] + chain_sequences[i_t2]
                     to_skip.add(i_t2)
 
@@ -18,10 +18,77 @@
 #       • 
 # -----------------------------------------------------------------------------
 
+import hashlib
 import os
+import shutil
+import tempfile
 
 from .Graph import DirectedGraph
 
+# Name of the directory (inside the output directory) where rendered graphs are cached
+RENDER_CACHE_DIRNAME = '.cache'
+# Size of the write buffer used when saving graphviz sources (the source is written in many small fragments)
+SAVE_BUFFER_SIZE = 2 ** 20
+
+
+def render_source(source, dirpath, name, format, delete_gv=False, use_cache=False, engine='dot') -> None:
+    """
+    Renders the graphviz source of a graph. As sources are plain strings, this function can be used to render
+    several interactional sequences in parallel (e.g. using a `concurrent.futures.ProcessPoolExecutor`)
+    :param source: graphviz code of the graph (see `InteractionalSequence.source`)
+    :type source: str
+    :param dirpath: path where the graph should be saved
+    :type dirpath: str
+    :param name: name of the file
+    :type name: str
+    :param format: file format used to save the graph (e.g. png, pdf, etc.)
+    :type format: str
+    :param delete_gv: should the graphviz code be deleted once the graph generated
+    :type delete_gv: bool
+    :param use_cache: whether rendered graphs should be cached (in `dirpath`/.cache) so that identical graphs
+    are not rendered again by graphviz. Cached graphs are never evicted: delete the cache directory to clear it
+    :type use_cache: bool
+    :param engine: graphviz layout engine used to render the graph (e.g. dot, sfdp, etc.)
+    :type engine: str
+    :return: None
+    :rtype: None
+    """
+    import graphviz
+
+    os.makedirs(dirpath, exist_ok=True)
+    full_filepath = os.path.join(dirpath, '{}.gv'.format(name))
+    output_filepath = '{}.{}'.format(full_filepath, format)
+    graph = graphviz.Source(source, engine=engine)
+    if not delete_gv:
+        graph.save(filename=full_filepath)
+
+    cache_filepath = None
+    if use_cache:
+        # Rendered graphs are identified by the hash of their graphviz source (and of the engine used)
+        cache_dirpath = os.path.join(dirpath, RENDER_CACHE_DIRNAME)
+        os.makedirs(cache_dirpath, exist_ok=True)
+        cache_filepath = os.path.join(cache_dirpath, '{}.{}'.format(
+            hashlib.blake2b('{}\n{}'.format(engine, source).encode()).hexdigest(), format))
+
+    if cache_filepath and os.path.exists(cache_filepath):
+        shutil.copyfile(cache_filepath, output_filepath)
+    else:
+        # The source is piped to graphviz and its output written directly, without going through a .gv file
+        rendered = graph.pipe(format=format)
+        with open(output_filepath, 'wb') as output_file:
+            output_file.write(rendered)
+        if cache_filepath:
+            # The cache may be shared by several processes: the graph is copied to a temporary file which is then
+            # atomically moved into place, so that a partially written cache entry is never read
+            cache_file, tmp_cache_filepath = tempfile.mkstemp(dir=cache_dirpath, suffix='.tmp')
+            os.close(cache_file)
+            try:
+                shutil.copyfile(output_filepath, tmp_cache_filepath)
+                os.replace(tmp_cache_filepath, cache_filepath)
+            except BaseException:
+                os.remove(tmp_cache_filepath)
+                raise
+
 class InteractionalSequence(object):
     """
     Class used to store a raw interactional sequence and its best path (if available)
@@ -37,19 +104,46 @@ class InteractionalSequence(object):
         self._interactional_sequence = interactional_sequence
         self._best_path = None
 
-    def source(self, raw_with_best_path=True) -> str:
+    def source(self, raw_with_best_path=True, timeline=None) -> str:
         """
         Returns the graphviz source of a graphviz graph
         :param raw_with_best_path: whether the best path be overlaid on the raw graph. If False, only
         the best path will be printed.
         :type raw_with_best_path: bool
+        :param timeline: whether the segments should be aligned on a timeline, or maximum number of segments for which
+        the timeline is drawn (see `generate_interactional_sequence_visualisation`)
+        :type timeline: Optional[Union[bool, int]]
         :return: graphviz code for the graph
         :rtype: str
         """
-        graph = self._to_graph_viz(raw_with_best_path=raw_with_best_path)
+        graph = self._to_graph_viz(raw_with_best_path=raw_with_best_path, timeline=timeline)
         return graph.source
 
-    def render(self, dirpath, name, format, raw_with_best_path=True, delete_gv=False) -> None:
+    def save(self, filepath, raw_with_best_path=True, timeline=None, engine=None) -> str:
+        """
+        Saves the graphviz source of the graph to a file. The source is streamed to the file through a large write
+        buffer as it is generated, rather than being built in memory first.
+        :param filepath: path of the file (e.g. `graph.gv`)
+        :type filepath: str
+        :param raw_with_best_path: whether the best path be overlaid on the raw graph. If False, only
+        the best path will be printed.
+        :type raw_with_best_path: bool
+        :param timeline: whether the segments should be aligned on a timeline, or maximum number of segments for which
+        the timeline is drawn (see `generate_interactional_sequence_visualisation`)
+        :type timeline: Optional[Union[bool, int]]
+        :param engine: graphviz layout engine (see `generate_interactional_sequence_visualisation`)
+        :type engine: Optional[str]
+        :return: graphviz layout engine that should be used to render the saved graph
+        :rtype: str
+        """
+        from .graph_visualisation import write_interactional_sequence_visualisation
+        edges, highlight_edges = self._visualisation_edges(raw_with_best_path=raw_with_best_path)
+        with open(filepath, 'w', encoding='utf-8', buffering=SAVE_BUFFER_SIZE) as out:
+            return write_interactional_sequence_visualisation(out, edges, highlight_edges=highlight_edges,
+                                                              timeline=timeline, engine=engine)
+
+    def render(self, dirpath, name, format, raw_with_best_path=True, delete_gv=False, timeline=None,
+               use_cache=False, engine=None) -> None:
         """
 
         :param dirpath: path where the graph should be saved
@@ -63,17 +157,24 @@ class InteractionalSequence(object):
         :type raw_with_best_path: bool
         :param delete_gv:
         :type delete_gv: should the graphviz code be deleted once the graph generated
+        :param timeline: whether the segments should be aligned on a timeline, or maximum number of segments for which
+        the timeline is drawn (see `generate_interactional_sequence_visualisation`)
+        :type timeline: Optional[Union[bool, int]]
+        :param use_cache: whether rendered graphs should be cached (in `dirpath`/.cache) so that identical graphs
+        are not rendered again by graphviz (e.g. when the same files are processed several times). Cached graphs are
+        never evicted (see `render_source`)
+        :type use_cache: bool
+        :param engine: graphviz layout engine used to render the graph, chosen according to the size of the graph
+        if None (see `generate_interactional_sequence_visualisation`)
+        :type engine: Optional[str]
         :return: None
         :rtype: None
         """
-        os.makedirs(dirpath, exist_ok=True)
-        full_filepath = os.path.join(dirpath, '{}.gv'.format(name))
-        graph = self._to_graph_viz(raw_with_best_path=raw_with_best_path)
-        graph.render(filename=full_filepath, format=format)
-        if delete_gv:
-            os.remove(full_filepath)
-
-    def _to_graph_viz(self, raw_with_best_path=True):
+        graph = self._to_graph_viz(raw_with_best_path=raw_with_best_path, timeline=timeline, engine=engine)
+        render_source(graph.source, dirpath=dirpath, name=name, format=format, delete_gv=delete_gv,
+                      use_cache=use_cache, engine=graph.engine)
+
+    def _to_graph_viz(self, raw_with_best_path=True, timeline=None, engine=None):
         """
         Generates the graph for the given interactional sequence. If no best path exists, the raw interaction
         graph is plotted. If the best path exists, only the best path will be printed. To print the raw interactional
@@ -81,15 +182,33 @@ class InteractionalSequence(object):
         :param raw_with_best_path: whether the best path be overlaid on the raw graph. If False, only
         the best path will be printed.
         :type raw_with_best_path: bool
-        :return: graphviz Digraph object
-        :rtype: graphviz.Digraph
+        :param timeline: whether the segments should be aligned on a timeline, or maximum number of segments for which
+        the timeline is drawn (see `generate_interactional_sequence_visualisation`)
+        :type timeline: Optional[Union[bool, int]]
+        :param engine: graphviz layout engine (see `generate_interactional_sequence_visualisation`)
+        :type engine: Optional[str]
+        :return: graphviz Source object
+        :rtype: graphviz.Source
         """
         from .graph_visualisation import generate_interactional_sequence_visualisation
+        edges, highlight_edges = self._visualisation_edges(raw_with_best_path=raw_with_best_path)
+        return generate_interactional_sequence_visualisation(edges, highlight_edges=highlight_edges,
+                                                             timeline=timeline, engine=engine)
+
+    def _visualisation_edges(self, raw_with_best_path=True):
+        """
+        Returns the edges that should be drawn and the edges that should be highlighted. If no best path exists, the
+        raw interaction graph is drawn. If the best path exists, only the best path is drawn, unless
+        `raw_with_best_path=True`, in which case the raw graph is drawn with the best path highlighted.
+        :param raw_with_best_path: whether the best path be overlaid on the raw graph
+        :type raw_with_best_path: bool
+        :return: list of edges to draw and edges to highlight
+        :rtype: tuple
+        """
         if raw_with_best_path and self._best_path:
-            return generate_interactional_sequence_visualisation(list(self._interactional_sequence),
-                                                                 highlight_edges=list(self._best_path))
+            return list(self._interactional_sequence), self._best_path
         else:
-            return generate_interactional_sequence_visualisation(list(self))
+            return list(self), ()
 
     def __getitem__(self, index):
         return list(self.__iter__())[index]
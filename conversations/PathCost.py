@@ -17,7 +17,7 @@
 #   Description: 
 #       • 
 # -----------------------------------------------------------------------------
-from copy import deepcopy
+from copy import copy
 
 from conversations.Graph import Cost, Node
 from conversations.Segment import Segment
@@ -27,6 +27,9 @@ class PathCost(Cost):
     """
     Class use to compute the score of a given path
     """
+    __slots__ = ('_speaker_bits', '_speaker_mask', '_last_speaker', '_num_segments', '_duration',
+                 '_turn_transitions', '_multi_unit_turn_transitions')
+
     def __init__(self, segment: Segment) -> None:
         """
         Initialisator
@@ -34,7 +37,15 @@ class PathCost(Cost):
         :type segment: Segment
         """
         self._ancestor = segment
-        self._speakers = [segment.speaker]
+        # Only the set of speakers (as a bit mask), the last speaker and the number of segments are needed to score
+        # a path, this allows extending a path in constant time without keeping the whole sequence of speakers.
+        # Speakers are given a bit in order of appearance. The mapping is created here and shared (by the shallow
+        # copies made in `__add__`) by all the paths starting from this segment only, so that it stays small and
+        # is never shared between graphs.
+        self._speaker_bits = {segment.speaker: 1}
+        self._speaker_mask = 1
+        self._last_speaker = segment.speaker
+        self._num_segments = 1
         self._duration = segment.duration
         self._turn_transitions = 0
         self._multi_unit_turn_transitions = 0
@@ -46,7 +57,7 @@ class PathCost(Cost):
         :return: length of the speaker set (i.e. number of different speaker in a sequence)
         :rtype: int
         """
-        return len(set(self._speakers))
+        return bin(self._speaker_mask).count('1')
 
     @property
     def num_segments(self) -> int:
@@ -55,7 +66,7 @@ class PathCost(Cost):
         :return: number of segments
         :rtype: int
         """
-        return len(self._speakers)
+        return self._num_segments
 
     @property
     def num_turns(self) -> int:
@@ -112,17 +123,23 @@ class PathCost(Cost):
         """
         assert isinstance(other, Node), ValueError('Can only add Node (or inherited) to PathCost!')
 
-        # Create fresh copy
-        new_cost = deepcopy(self)
-        # /!\ use original ancestor as deep copy creates a fresh copy (and thus changes its address) which prevents
-        # best path selection to work properly.
-        new_cost._ancestor = self._ancestor
+        # Create fresh copy. A shallow copy keeps the original ancestor (whose address is used for best path
+        # selection). `_speaker_bits` is shared on purpose by all the paths starting from the same segment: it is
+        # only ever extended (a speaker keeps its bit once given), so each path's mask stays valid when another path
+        # adds new speakers. The other attributes are immutable values.
+        new_cost = copy(self)
 
         # Add segment information
+        speaker = other.speaker
         new_cost._duration += other.duration
-        new_cost._turn_transitions += 1 if other.speaker != new_cost._speakers[-1] else 0
-        new_cost._multi_unit_turn_transitions += 1 if other.speaker == new_cost._speakers[-1] else 0
-        new_cost._speakers.append(other.speaker)
+        new_cost._turn_transitions += 1 if speaker != self._last_speaker else 0
+        new_cost._multi_unit_turn_transitions += 1 if speaker == self._last_speaker else 0
+        speaker_bit = self._speaker_bits.get(speaker)
+        if speaker_bit is None:
+            speaker_bit = self._speaker_bits[speaker] = 1 << len(self._speaker_bits)
+        new_cost._speaker_mask = self._speaker_mask | speaker_bit
+        new_cost._last_speaker = speaker
+        new_cost._num_segments += 1
 
         return new_cost
 
@@ -24,6 +24,8 @@ class Segment(Node):
     """
     Class use to represent segments in a graph
     """
+    __slots__ = ('_index', '_speaker', '_onset', '_offset')
+
     def __init__(self, index, speaker, onset, offset, **kwargs):
         """
         Initialisator
@@ -19,17 +19,17 @@
 # -----------------------------------------------------------------------------
 import logging
 import re
-from operator import attrgetter
 
 from conversations.Graph import DirectedGraph
 from conversations.InteractionalSequence import InteractionalSequence
 from conversations.PathCost import PathCost
 from conversations.Segment import Segment
 from conversations.data_importers import from_eaf, from_csv, from_txt, from_rttm, from_its
-from conversations.utils import flatten, overlaps
+from conversations.utils import iflatten
 
 from typing import List, Union, Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 
@@ -69,21 +69,16 @@ class InteractionalSequences(object):
         :rtype: pd.DataFrame
         """
 
-        def append_column(is_idx, idx, col, payload):
-            pad = ','
-            if col == 'inter_seq_index' and segments.loc[idx, 'inter_seq_index'] != '':
-                if segments.loc[idx, 'inter_seq_index'].split(';')[-1] != str(is_idx):
-                    pad = ';'
-                else:
-                    if col == 'inter_seq_index':
-                        return
+        # Values of each cell are accumulated in lists (one per column and segment) and joined once at the end
+        cells = {col: dict() for col in ('inter_seq_index', 'conv_turn_index', 'is_prompt_to', 'is_response_to',
+                                         'is_self_prompt_to', 'is_self_response_to')}
 
-            if col == 'conv_turn_index' and segments.loc[idx,col] != '':
-                if segments.loc[idx, col].split(';')[-1].split(',')[-1] == payload:
-                    return
-
-            prev_content = list(filter(lambda t: bool(t) if pad==',' else True, segments.loc[idx, col].split(pad)))
-            segments.loc[idx, col] = pad.join(prev_content + [payload])
+        def append_column(idx, col, payload):
+            values = cells[col].setdefault(idx, [])
+            # Consecutive duplicates are not stored for these columns
+            if col in ('inter_seq_index', 'conv_turn_index') and values and values[-1] == payload:
+                return
+            values.append(payload)
 
         segments = self._data.copy()
 
@@ -105,26 +100,34 @@ class InteractionalSequences(object):
 
         for index_is, interactional_sequence in enumerate(self.interactional_sequences, 1):
             # Concatenate old labelling with new labelling in case interactional chains were disconnected
-            indices = sorted(list(set(flatten(interactional_sequence))), key=attrgetter('index'))
+            # Rank (starting from 1) of each node in the interactional sequence, computed once for all the edges
+            # (node indices are plain integers: they are sorted directly, without a key function)
+            indices = sorted({node.index for node in iflatten(interactional_sequence)})
+            turn_indices = {index: str(rank) for rank, index in enumerate(indices, 1)}
 
             for start_node, end_node in interactional_sequence:
                 is_turn_transition = start_node.speaker != end_node.speaker
                 is_multi_unit_transition = not(is_turn_transition)
 
                 if is_turn_transition:
-                    append_column(index_is, start_node.index, 'is_prompt_to', str(end_node.index))
-                    append_column(index_is, end_node.index, 'is_response_to', str(start_node.index))
+                    append_column(start_node.index, 'is_prompt_to', str(end_node.index))
+                    append_column(end_node.index, 'is_response_to', str(start_node.index))
 
                 if is_multi_unit_transition:
-                    append_column(index_is, start_node.index, 'is_self_prompt_to', str(end_node.index))
-                    append_column(index_is, end_node.index, 'is_self_response_to', str(start_node.index))
+                    append_column(start_node.index, 'is_self_prompt_to', str(end_node.index))
+                    append_column(end_node.index, 'is_self_response_to', str(start_node.index))
 
 
-                append_column(index_is, start_node.index, 'inter_seq_index', str(index_is))
-                append_column(index_is, start_node.index, 'conv_turn_index', str(indices.index(start_node)+1))
-                append_column(index_is, end_node.index, 'inter_seq_index', str(index_is))
-                append_column(index_is, end_node.index, 'conv_turn_index', str(indices.index(end_node) + 1))
+                append_column(start_node.index, 'inter_seq_index', str(index_is))
+                append_column(start_node.index, 'conv_turn_index', turn_indices[start_node.index])
+                append_column(end_node.index, 'inter_seq_index', str(index_is))
+                append_column(end_node.index, 'conv_turn_index', turn_indices[end_node.index])
 
+        # Interactional sequences indices are separated by ';', other values by ','
+        for col, col_cells in cells.items():
+            pad = ';' if col == 'inter_seq_index' else ','
+            if col_cells:
+                segments.loc[list(col_cells.keys()), col] = [pad.join(values) for values in col_cells.values()]
 
         segments['is_start_unit'] = segments.apply(axis=1, func=lambda row: (row['is_response_to'] == '' and
                                                                        row['is_self_response_to'] == '')
@@ -249,7 +252,8 @@ class Conversation(object):
         function. By default, all interactional sequences are returned.
         :type filtering_rules: Optional[Callable]
         :param kwargs: parameters given to the user defined functions (turn_transition_rules, best_path_selection_rules,
-        and filtering_rules)
+        and filtering_rules). `interactants`, if given, is stored as a frozenset: this is also what the user defined
+        functions receive (and what `user_defined_arguments` returns), whatever the iterable that was given
         :type kwargs: dict
         """
         if allowed_overlap: raise NotImplementedError
@@ -291,6 +295,10 @@ class Conversation(object):
         self._filtering_rules = filtering_rules
         self._best_path_selection_rules = best_path_selection_rules
 
+        # Interactants are only used for membership tests: store them once as a frozenset
+        if kwargs.get('interactants'):
+            kwargs['interactants'] = frozenset(kwargs['interactants'])
+
         self._kwargs = list(kwargs.keys()) # stores arguments to user-defined functions
         # Add them as attributes in case they might be needed
         for _kwargs_key, _kwargs_value in kwargs.items():
@@ -394,15 +402,20 @@ class Conversation(object):
     #   I/O
     #
     @classmethod
-    def from_csv(cls, filepath) -> pd.DataFrame:
+    def from_csv(cls, filepath, engine=None, **read_csv_kwargs) -> pd.DataFrame:
         """
-        Reads a CSV file and return a data frame
+        Reads a CSV file and return a data frame. Lines without speaker type (empty lines) are dropped.
         :param filepath: path to the CSV file to be read
         :type filepath: str
+        :param engine: parser used to read the CSV file ('polars', or any engine supported by `pd.read_csv`, e.g.
+        'pyarrow'). Defaults to the pandas C parser.
+        :type engine: str
+        :param read_csv_kwargs: additional keyword arguments passed to the CSV reader (e.g. `usecols`, `dtype`)
+        :type read_csv_kwargs: dict
         :return: pandas DataFrame
         :rtype: pd.DataFrame
         """
-        return from_csv(filepath)
+        return from_csv(filepath, engine=engine, **read_csv_kwargs)
 
     @classmethod
     def from_rttm(cls, filepath, name_mapping=None, source_file:str = None):
@@ -438,6 +451,7 @@ class Conversation(object):
         Reads a txt file and return a data frame. The input .txt should be a plain-text,
         tab-separated file with a header row that contains the column names.
         The three columns must be speaker_type , segment_onset , segment_offset
+        Lines without speaker type (empty lines) are dropped, as in `from_csv`.
         :param filepath: path to the txt file to be read
         :type filepath: str
         :return: pandas DataFrame
@@ -516,34 +530,55 @@ class Conversation(object):
         :rtype: pd.DataFrame
         """
 
-        # For each nodes, get connected nodes
-        segments['connected_nodes'] = segments.apply(axis=1,
-                func=lambda t_row: segments[
-                    segments.apply(axis=1,
-                                      # Get overlapping segments
-                        func=lambda c_row: (overlaps(c_row['segment_onset'], c_row['segment_offset'],
-                                                t_row['segment_onset'], t_row['segment_offset'] + self.allowed_gap))
-                                      # only look after. /!\ only use > and not >= as it might create cycles
-                                      and c_row['segment_onset'] > t_row['segment_onset']
-                                      # Remove identical segments
-                                      and t_row.name != c_row.name)
-                ])
+        # Interval sweep: when segments are sorted by onset, the candidates of a target segment (segments starting
+        # after it, and before its offset + allowed gap) form a contiguous window, found by binary search. The
+        # (target, candidate) pairs are then processed together with array operations rather than target by target
+        onsets = segments['segment_onset'].to_numpy()
+        offsets = segments['segment_offset'].to_numpy()
+        indices = segments.index.to_numpy()
+        # Speakers are encoded as integers (in sorted order, -1 for missing speakers)
+        speaker_codes, _ = pd.factorize(segments['speaker_type'], sort=True)
+
+        onset_order = np.argsort(onsets, kind='stable')
+        sorted_onsets = onsets[onset_order]
+        # only look after. /!\ only use > and not >= as it might create cycles
+        window_starts = np.searchsorted(sorted_onsets, onsets, side='right')
+        window_stops = np.searchsorted(sorted_onsets, offsets + self.allowed_gap, side='left')
+        window_sizes = np.maximum(window_stops - window_starts, 0)
+        target_positions = np.repeat(np.arange(len(onsets)), window_sizes)
+        window_offsets = np.arange(len(target_positions)) - np.repeat(np.cumsum(window_sizes) - window_sizes,
+                                                                      window_sizes)
+        candidate_positions = onset_order[np.repeat(window_starts, window_sizes) + window_offsets]
+        # Get overlapping segments (a candidate starting inside the window overlaps with the target if it is not
+        # empty) and remove identical segments
+        overlapping = ((offsets[candidate_positions] > onsets[candidate_positions])
+                       & (indices[candidate_positions] != indices[target_positions]))
+        target_positions, candidate_positions = target_positions[overlapping], candidate_positions[overlapping]
+        # Candidates of each target in their original order
+        order = np.lexsort((candidate_positions, target_positions))
+        target_positions, candidate_positions = target_positions[order], candidate_positions[order]
 
         if not self.allow_segment_jump:
             # Timeline  | t = t0 <-------------------------------------> t = t0 + allowed_gap
             # Target    |            |----------|
             # Candidate |               |---Keep---| |--Remove--|
-            segments['connected_nodes'] = segments['connected_nodes'].apply(
-                func=lambda df: (df.groupby('speaker_type')
-                                # Keep only the first segment for each candidate speaker
-                                .apply(lambda rows: (rows.sort_values(by='segment_onset', ascending=True)
-                                                    .head(n=1)))
-                                # Remove multi-indexing and keep original index
-                                .apply(lambda rows: rows if not rows.index.nlevels > 1
-                                                    else rows.droplevel(0))))
-
-        # Retrieve indexes of connected nodes
-        segments['connected_nodes'] = segments['connected_nodes'].apply(lambda df: list(df.index))
+            # Keep only the first segment for each candidate speaker: pairs are sorted by target, speaker, onset
+            # (and position), and the first pair of each (target, speaker) is kept
+            candidate_codes = speaker_codes[candidate_positions]
+            order = np.lexsort((candidate_positions, onsets[candidate_positions], candidate_codes, target_positions))
+            target_positions, candidate_positions = target_positions[order], candidate_positions[order]
+            candidate_codes = candidate_codes[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = ((target_positions[1:] != target_positions[:-1])
+                         | (candidate_codes[1:] != candidate_codes[:-1]))
+            keep = first & (candidate_codes >= 0)
+            target_positions, candidate_positions = target_positions[keep], candidate_positions[keep]
+
+        # Retrieve indexes of connected nodes (pairs are grouped by target segment)
+        connected_indices = indices[candidate_positions].tolist()
+        ends = np.cumsum(np.bincount(target_positions, minlength=len(onsets))).tolist()
+        segments['connected_nodes'] = pd.Series([connected_indices[begin:end] for begin, end in zip([0] + ends, ends)],
+                                                index=segments.index, dtype=object)
         return segments
 
     def _segments_to_graph(self, segments) -> DirectedGraph:
@@ -586,8 +621,11 @@ class Conversation(object):
         segments = self._find_connected_nodes(segments)
         interaction_graph = self._segments_to_graph(segments)
 
+        # Arguments of the user-defined functions (gathered once for all the interactional sequences)
+        user_defined_arguments = self.user_defined_arguments
+
         # Find interactional sequences
-        connected_components = interaction_graph.get_connected_components(**self.user_defined_arguments)
+        connected_components = interaction_graph.get_connected_components(**user_defined_arguments)
 
         # Transform connected components edges to graph
         interactional_sequences = [InteractionalSequence(p) for p in connected_components]
@@ -597,10 +635,10 @@ class Conversation(object):
             for inter_seq in interactional_sequences:
                 best_path = inter_seq._interactional_sequence.best_path(self.cost_type,
                                                                         self.best_path_selection_rules,
-                                                                        **self.user_defined_arguments)
+                                                                        **user_defined_arguments)
                 inter_seq._best_path = DirectedGraph.from_tuple_list(best_path)
         # Filter out sequences
         if self.filtering_rules:
-            interactional_sequences = self.filtering_rules(interactional_sequences, **self.user_defined_arguments)
+            interactional_sequences = self.filtering_rules(interactional_sequences, **user_defined_arguments)
 
         return InteractionalSequences(data=data, interactional_sequences=interactional_sequences)
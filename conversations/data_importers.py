@@ -18,30 +18,52 @@
 #       • 
 # -----------------------------------------------------------------------------
 
-import pandas as pd
 import logging
+import re
+
+import pandas as pd
 
 
-def from_csv(filepath) -> pd.DataFrame:
+def from_csv(filepath, engine=None, **read_csv_kwargs) -> pd.DataFrame:
     """
-    Reads a CSV file and return a data frame
+    Reads a CSV file and return a data frame. Lines without speaker type (empty lines) are dropped.
     :param filepath: path to the CSV file to be read
     :type filepath: str
+    :param engine: parser used to read the CSV file. 'polars' uses `polars.read_csv` (requires polars), any other
+    value is passed to `pd.read_csv` (e.g. 'c', the default, or 'pyarrow', multithreaded, which requires pyarrow)
+    :type engine: str
+    :param read_csv_kwargs: additional keyword arguments passed to `pd.read_csv` (e.g. `usecols`, `dtype`), or to
+    `polars.read_csv` when `engine='polars'`
+    :type read_csv_kwargs: dict
     :return: pandas DataFrame
     :rtype: pd.DataFrame
     """
     # TODO: for CLI interface, allow user to drop lines based on condition
-    df = pd.read_csv(filepath)
+    if engine == 'polars':
+        import polars as pl
+
+        df = pl.read_csv(filepath, **read_csv_kwargs)
+        # Empty lines are dropped before the data frame is converted
+        if 'speaker_type' in df.columns:
+            df = df.drop_nulls(subset=['speaker_type'])
+        return df.to_pandas()
+
+    df = pd.read_csv(filepath, engine=engine, **read_csv_kwargs)
+    if 'speaker_type' in df.columns:
+        df = df.dropna(subset=['speaker_type'])
 
     return df
 
 
-def from_rttm(cls, filepath, name_mapping=None, source_file: str = None):
+def from_rttm(filepath, name_mapping=None, source_file: str = None):
     """
     Reads a RTTM file and return a data frame with columns {"segment_onset","segment_offset","speaker_type"}
+    Only the file, tbeg, tdur and name fields of the RTTM are kept alongside them (file and name as strings,
+    tbeg and tdur as floats), the type, chnl, ortho, stype, conf and slat fields are not read.
     :param filepath: path to the RTTM file to be read
     :type filepath: str
-    :param name_mapping: mapping of the names used in the RTTM to new names, defaults to None, keeping the original names
+    :param name_mapping: mapping of the names used in the RTTM to new names, defaults to None, keeping the original names.
+                         Lines whose name is not in the mapping are dropped
     :type name_mapping: dict
     :param source_file: only keep lines belonging to that file, when not set, every line will be kept even if from different recordings
     :type source_file: str
@@ -63,6 +85,9 @@ def from_rttm(cls, filepath, name_mapping=None, source_file: str = None):
             "conf",
             "slat",
         ],
+        # Only read the columns we need
+        usecols=["file", "tbeg", "tdur", "name"],
+        dtype={"tbeg": "float64", "tdur": "float64", "file": "string", "name": "string"},
     )
     n_recordings = len(df["file"].unique())
     if n_recordings > 1 and not source_file:
@@ -79,6 +104,8 @@ def from_rttm(cls, filepath, name_mapping=None, source_file: str = None):
         df["speaker_type"] = df["name"].map(name_mapping)
     else:
         df["speaker_type"] = df["name"]
+    # Lines whose speaker has no mapping (and thus no speaker type) are dropped, as in `from_csv`
+    df = df.dropna(subset=["speaker_type"])
 
     if not df.shape[0]:
         logging.warning(
@@ -97,6 +124,9 @@ def from_its(filepath, speaker_mapping=None, recording_num=None) -> pd.DataFrame
     Reads an ITS file and return a data frame with columns {"segment_onset","segment_offset","speaker_type"}
     :param filepath: path to the ITS file to be read
     :type filepath: str
+    :param speaker_mapping: mapping of the LENA speaker codes to new names, defaults to None, keeping the original codes.
+                            Segments whose code is not in the mapping are dropped
+    :type speaker_mapping: dict
     :param recording_num: only keep lines belonging to that recording number, when not set, every line will be kept even if from different recordings
     :type recording_num: int
     :return: pandas DataFrame
@@ -148,6 +178,8 @@ def from_its(filepath, speaker_mapping=None, recording_num=None) -> pd.DataFrame
             )
 
     df = pd.DataFrame(segments, columns=['segment_onset', 'segment_offset', 'speaker_type'])
+    # Segments whose speaker has no mapping (and thus no speaker type) are dropped, as in `from_csv`
+    df = df.dropna(subset=['speaker_type'])
 
     return df
 
@@ -157,6 +189,7 @@ def from_txt(filepath) -> pd.DataFrame:
     Reads a txt file and return a data frame. The input .txt should be a plain-text,
     tab-separated file with a header row that contains the column names.
     The three columns must be speaker_type , segment_onset , segment_offset
+    Lines without speaker type (empty lines) are dropped, as in `from_csv`.
     :param filepath: path to the txt file to be read
     :type filepath: str
     :return: pandas DataFrame
@@ -164,6 +197,8 @@ def from_txt(filepath) -> pd.DataFrame:
     """
     # TODO: for CLI interface, allow user to drop lines based on condition
     df = pd.read_csv(filepath, sep='\t')
+    if 'speaker_type' in df.columns:
+        df = df.dropna(subset=['speaker_type'])
 
     return df
 
@@ -184,14 +219,14 @@ def from_eaf(filepath) -> pd.DataFrame:
     import pympi
 
     eaf = pympi.Elan.Eaf(filepath)
-    segments = {}
+    segments = []
 
-    for tier_name in eaf.tiers:
-        annotations = eaf.tiers[tier_name][0]
+    timeslots = eaf.timeslots
+    for tier_name, tier in eaf.tiers.items():
+        annotations = tier[0]
 
-        for aid in annotations:
-            (start_ts, end_ts, value, svg_ref) = annotations[aid]
-            (start_t, end_t) = (eaf.timeslots[start_ts], eaf.timeslots[end_ts])
+        for (start_ts, end_ts, _value, _svg_ref) in annotations.values():
+            (start_t, end_t) = (timeslots[start_ts], timeslots[end_ts])
 
             segment = {
                 "segment_onset": int(round(start_t)),
@@ -199,6 +234,6 @@ def from_eaf(filepath) -> pd.DataFrame:
                 "speaker_type": tier_name,
             }
 
-            segments[aid] = segment
+            segments.append(segment)
 
-    return pd.DataFrame(segments.values())
\ No newline at end of file
+    return pd.DataFrame(segments, columns=['segment_onset', 'segment_offset', 'speaker_type'])
\ No newline at end of file
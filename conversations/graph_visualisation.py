@@ -17,25 +17,127 @@
 #   Description: 
 #       • 
 # -----------------------------------------------------------------------------
-from typing import List, Set
+import warnings
+from typing import Dict, Iterable, List, Optional, TextIO, Union
 
 import graphviz
+from graphviz.quoting import quote
 from itertools import cycle
+from operator import itemgetter
 
 from .Graph import Node
-from .utils import pairwise
+
+# Above this number of segments, the timeline is not drawn by default
+TIMELINE_MAX_SEGMENTS = 200
+# Above this number of segments, graphs drawn without timeline (large graphs) are laid out by a faster engine than
+# dot by default
+LARGE_GRAPH_MIN_SEGMENTS = 500
+DEFAULT_ENGINE = 'dot'
+LARGE_GRAPH_ENGINE = 'sfdp'
 
 NODE_START_COLOR = 'chartreuse'
 NODE_END_COLOR = 'crimson'
+# Colour of the nodes given their type (0: other node, 1: start node, 2: end node)
+NODE_TYPE_COLORS = ('black', NODE_START_COLOR, NODE_END_COLOR)
+NODE_TYPE_STYLES = ('solid', 'filled', 'filled')
 COLOR_LIST = ["lightpink", "lightyellow", "lightskyblue",
               "lightcyan", "lightsteelblue", "lightgrey", "lightslategray", "lightblue",
               "lightgray", "lightgoldenrod", "lightsalmon",
               "lightseagreen", "lightslateblue", "lightgreen", "lightcoral"]
 
 
+def _attr_list(attributes: dict) -> str:
+    """
+    Formats a dictionary of attributes as a DOT attribute list
+    :param attributes: dictionary of attributes/values
+    :type attributes: dict
+    :return: DOT attribute list (e.g. `[shape=box style=invis]`)
+    :rtype: str
+    """
+    return '[{}]'.format(' '.join('{}={}'.format(key, quote(value)) for key, value in sorted(attributes.items())))
+
+
+# Attribute lists that do not depend on the interactional sequence are only formatted once
+GRAPH_ATTR = _attr_list({"rankdir": "LR", 'labeljust': 'l', "newrank": "true"})
+GRAPH_NO_TIMELINE_ATTR = _attr_list({"rankdir": "LR", 'labeljust': 'l'})
+# Large graphs: straight edges and fewer network simplex/crossing minimisation iterations
+GRAPH_LARGE_ATTR = _attr_list({"rankdir": "LR", 'labeljust': 'l', 'splines': 'line', 'nslimit': '1', 'mclimit': '1'})
+RANK_SAME_ATTR = _attr_list({'rank': 'same'})
+INVISIBLE_ATTR = _attr_list({'style': 'invis'})
+INVISIBLE_BOX_ATTR = _attr_list({'shape': 'box', 'style': 'invis'})
+PLAINTEXT_ATTR = _attr_list({'shape': 'plaintext'})
+BOX_ATTR = _attr_list({'shape': 'box'})
+NOT_CONSTRAINT_ATTR = _attr_list({'constraint': 'false'})
+HIGHLIGHT_ATTR = _attr_list({'color': 'red', 'penwidth': '4'})
+TIMELINE_END = quote('TLEND')
+RANK_SAME_GROUP = '\t{{rank=same; {};}}\n'
+STATEMENT = '\t\t{}\n'
+EDGE = '\t\t{} -> {}\n'
+INVISIBLE_EDGE = '\t\t{{}} -> {{}} {}\n'.format(INVISIBLE_ATTR)
+HIGHLIGHT_EDGE = '\t\t{{}} -> {{}} {}\n'.format(HIGHLIGHT_ATTR)
+SEGMENT_NODE = '\t\t{} [color={} group={} style={}]\n'
+SEGMENT_EDGE = '\t\t{{}} -> {{}} {}\n'.format(NOT_CONSTRAINT_ATTR)
+ACTOR_NODE = '\t\t{} [group={} shape=plaintext]\n'
+ACTOR_END_NODE = '\t\t{} [group={} style=invis]\n'
+CLUSTER_NAME = 'cluster_{}'
+ACTOR_SUBGRAPH_NAME = 'actor_{}'
+# Attribute list of the clusters of the actors (one for each colour)
+CLUSTER_ATTRS = tuple(_attr_list({'bgcolor': color}) for color in COLOR_LIST)
+
+
+def _open_subgraph(dot: List[str], name: Optional[str] = None, graph_attr: Optional[str] = None,
+                   node_attr: Optional[str] = None, edge_attr: Optional[str] = None) -> None:
+    """
+    Writes the opening statements of a subgraph to the DOT source. Statements belonging to the subgraph should then be
+    written using `_statement`, and the subgraph closed using `_close_subgraph`
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param name: quoted name of the subgraph, anonymous subgraph if None
+    :type name: Optional[str]
+    :param graph_attr: attribute list applied to the subgraph
+    :type graph_attr: Optional[str]
+    :param node_attr: attribute list applied to the nodes of the subgraph
+    :type node_attr: Optional[str]
+    :param edge_attr: attribute list applied to the edges of the subgraph
+    :type edge_attr: Optional[str]
+    :return: None
+    :rtype: None
+    """
+    dot.append('\tsubgraph {} {{\n'.format(name) if name else '\t{\n')
+    for keyword, attributes in (('graph', graph_attr), ('node', node_attr), ('edge', edge_attr)):
+        if attributes:
+            dot.append('\t\t{} {}\n'.format(keyword, attributes))
+
+
+def _statement(dot: List[str], statement: str) -> None:
+    """
+    Writes a node or an edge statement inside the current subgraph
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param statement: DOT statement (e.g. `1 -> 2 [constraint=false]`)
+    :type statement: str
+    :return: None
+    :rtype: None
+    """
+    dot.append(STATEMENT.format(statement))
+
+
+def _close_subgraph(dot: List[str]) -> None:
+    """
+    Writes the closing statement of the current subgraph
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :return: None
+    :rtype: None
+    """
+    dot.append('\t}\n')
+
+
 def get_actors(interactional_sequence: List[Node]) -> dict:
     """
-    Returns a dictionary of actors with a list of their nodes as value
+    Returns a dictionary of actors with a list of their nodes as value. This function is public API for users
+    inspecting interactional sequences; it is not used to draw graphs (`_write_dot` groups the segments of each actor
+    itself, while reading the attributes of each node once)
     :param interactional_sequence: tuple of nodes
     :type interactional_sequence: List[Node]
     :return: dictionary of actors with a list of their nodes as value
@@ -54,185 +156,326 @@ def get_actors(interactional_sequence: List[Node]) -> dict:
     return actors
 
 
-def _timeline_subgraph(segment_onsets: List[int]) -> graphviz.Digraph:
+def _timeline_node(onset: int) -> str:
+    """
+    Returns the quoted name of the timeline node corresponding to an onset
+    :param onset: onset of a segment
+    :type onset: int
+    :return: quoted name of the timeline node
+    :rtype: str
+    """
+    return quote('TL{}'.format(onset))
+
+
+def _timeline_subgraph(dot: List[str], segment_onsets: List, timeline_names: Dict[int, str]) -> None:
     """
-    Creates a subgraph for the timeline which will be used to nodes
-    :param segment_onsets: list of segment onsets
-    :type segment_onsets: List[int]
-    :return: graphviz Digraph subgraph for the timeline
-    :rtype: graphviz.Digraph
+    Writes a subgraph for the timeline which will be used to nodes
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param segment_onsets: list of (name, onset) pairs of each node, sorted by onset
+    :type segment_onsets: list of (name, onset) pairs
+    :param timeline_names: dictionary of onsets with the quoted name of their timeline node as value
+    :type timeline_names: Dict[int, str]
+    :return: None
+    :rtype: None
     """
-    tl_subgraph = graphviz.Digraph(edge_attr={'style': 'invis'},
-                                   node_attr={'shape': 'box', 'style': 'invis'})
-    # Normal nodes
-    for _, node in segment_onsets:
-        tl_subgraph.node(name=node)
-    for (_, begin), (_, end) in pairwise(segment_onsets):
-        tl_subgraph.edge(begin, end, style='invis')
+    timeline_nodes = [timeline_names[onset] for _, onset in segment_onsets]
+    _open_subgraph(dot, node_attr=INVISIBLE_BOX_ATTR, edge_attr=INVISIBLE_ATTR)
+    # Normal nodes (all the lines are built at once)
+    dot.extend(STATEMENT.format(node) for node in timeline_nodes)
+    dot.extend(INVISIBLE_EDGE.format(begin, end) for begin, end in zip(timeline_nodes, timeline_nodes[1:]))
     # End node
-    tl_subgraph.node(name="TLEND")
-    tl_subgraph.edge(end, "TLEND", style='invis')
-    
-    return tl_subgraph
+    _statement(dot, TIMELINE_END)
+    dot.append(INVISIBLE_EDGE.format(timeline_nodes[-1], TIMELINE_END))
+    _close_subgraph(dot)
 
 
-def _actor_subgraph(actor_names: List[str]) -> graphviz.Digraph:
+def _actor_subgraph(dot: List[str], actor_names: Dict[str, str]) -> None:
     """
-    Creates a subgraph that contains one anchor node for each actor. This anchor nodes will be connected to the
+    Writes a subgraph that contains one anchor node for each actor. This anchor nodes will be connected to the
     first real segment of each actor
-    :param actor_names: name of the actor
-    :type actor_names: str
-    :return: graphviz Digraph subgraph of anchor nodes for each actor and edges between each pair of anchor node
-    :rtype: graphviz.Digraph
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param actor_names: dictionary of actors with their quoted name in the graph as value, sorted by actor
+    :type actor_names: Dict[str, str]
+    :return: None
+    :rtype: None
     """
     # Actor subgraph
-    actor_subgraph = graphviz.Digraph(edge_attr={'style': 'invis'},
-                                      node_attr={'shape': 'plaintext'},
-                                      graph_attr={'rank': 'same'})
-    for begin, end in pairwise(sorted(actor_names)):
-        actor_subgraph.edge(begin, end)
+    _open_subgraph(dot, graph_attr=RANK_SAME_ATTR, node_attr=PLAINTEXT_ATTR, edge_attr=INVISIBLE_ATTR)
+    sorted_actor_names = list(actor_names.values())
+    dot.extend(EDGE.format(begin, end) for begin, end in zip(sorted_actor_names, sorted_actor_names[1:]))
+    _close_subgraph(dot)
 
-    return actor_subgraph
 
-
-def _segment_subgraphs(actors_name_segments: dict, start_nodes: Set[Node], end_nodes: Set[Node]) -> List[graphviz.Digraph]:
+def _segment_subgraphs(dot: List[str], actors_name_segments: dict, node_types: bytearray,
+                       actor_names: Dict[str, str], actor_groups: Dict[str, str],
+                       actor_end_names: Dict[str, str], clusters: bool = True) -> None:
     """
-    Creates the node for each segment of each actor
-    :param actors_name_segments: dictionary of actors with a list of their segments as value
+    Writes the node for each segment of each actor, with one subgraph for each actor
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param actors_name_segments: dictionary of actors with the list of the (quoted name, onset, local id) of their
+    segments, sorted by onset, as value
     :type actors_name_segments: dict
-    :param start_nodes: list of all the node that are start nodes
-    :type start_nodes: Set[Node]
-    :param end_nodes: list of all the node that are end nodes
-    :type end_nodes: Set[Node]
-    :return: list of graphviz Digraph subgraph with one subgraph for each actor, containing all of its nodes
-    :rtype: List[graphviz.Digraph]
+    :param node_types: type of each node, indexed by local node id (see NODE_TYPE_COLORS)
+    :type node_types: bytearray
+    :param actor_names: dictionary of actors with their quoted name in the graph as value
+    :type actor_names: Dict[str, str]
+    :param actor_groups: dictionary of actors with the quoted name of their group as value
+    :type actor_groups: Dict[str, str]
+    :param actor_end_names: dictionary of actors with the quoted name of their end node as value
+    :type actor_end_names: Dict[str, str]
+    :param clusters: whether the subgraph of each actor should be drawn as a (coloured) cluster. Clusters are costly
+    to lay out.
+    :type clusters: bool
+    :return: None
+    :rtype: None
     """
-    graphs = []
-
-    graph_colors = cycle(COLOR_LIST)
+    # The templates are module constants: only their bound `format` methods are looked up here
+    cluster_attrs = cycle(CLUSTER_ATTRS)
+    subgraph_name = (CLUSTER_NAME if clusters else ACTOR_SUBGRAPH_NAME).format
+    segment_node, segment_edge, edge = SEGMENT_NODE.format, SEGMENT_EDGE.format, EDGE.format
     for actor_name, actor_segments in actors_name_segments.items():
         # Subgraph (cluster) declaration (cluster is an obligatory prefix)
-        segment_subgraph = graphviz.Digraph(name='cluster_{}'.format(actor_name),
-                                            edge_attr={'style': 'invis'},
-                                            node_attr={'shape': 'box'},
-                                            graph_attr={"bgcolor": next(graph_colors)})
+        _open_subgraph(dot, name=quote(subgraph_name(actor_name)),
+                       graph_attr=next(cluster_attrs) if clusters else None,
+                       node_attr=BOX_ATTR, edge_attr=INVISIBLE_ATTR)
+
+        actor_node_name = actor_names[actor_name]
+        actor_group = actor_groups[actor_name]
+        actor_end_name = actor_end_names[actor_name]
+
         # Add begin node and end node
-        segment_subgraph.node(actor_name, group='GR{}'.format(actor_name), shape="plaintext")
-        segment_subgraph.node('{}END'.format(actor_name), group='GR{}'.format(actor_name), style='invis')
-
-        # Add segment nodes
-        for actor_segment in actor_segments:
-            actor_segment_color = 'black'
-            actor_segment_color = NODE_START_COLOR if actor_segment in start_nodes else actor_segment_color
-            actor_segment_color = NODE_END_COLOR if actor_segment in end_nodes else actor_segment_color
-            node_style = "filled" if actor_segment_color != 'black' else 'solid'
-            segment_subgraph.node(str(actor_segment.index), group='GR{}'.format(actor_name),
-                                  color=actor_segment_color, style=node_style)
+        dot.append(ACTOR_NODE.format(actor_node_name, actor_group))
+        dot.append(ACTOR_END_NODE.format(actor_end_name, actor_group))
+
+        # Add segment nodes (all the lines are built at once)
+        segment_names = [segment_name for segment_name, _, _ in actor_segments]
+        segment_types = [node_types[segment_id] for _, _, segment_id in actor_segments]
+        dot.extend(segment_node(segment_name, NODE_TYPE_COLORS[segment_type], actor_group,
+                                NODE_TYPE_STYLES[segment_type])
+                   for segment_name, segment_type in zip(segment_names, segment_types))
 
         # Add links between nodes
-        for begin, end in pairwise(actor_segments):
-            segment_subgraph.edge(str(begin.index), str(end.index), constraint="false")
+        dot.extend(segment_edge(begin, end) for begin, end in zip(segment_names, segment_names[1:]))
 
         # Link last node to end node and first node to start node
-        segment_subgraph.edge(actor_name, str(actor_segments[0].index))
-        segment_subgraph.edge(str(actor_segments[-1].index), '{}END'.format(actor_name))
-
-        # Add to graph pool
-        graphs.append(segment_subgraph)
+        dot.append(edge(actor_node_name, segment_names[0]))
+        dot.append(edge(segment_names[-1], actor_end_name))
 
-    return graphs
+        _close_subgraph(dot)
 
 
-def _turn_subgraph(interactional_sequence: List[Node], highlight_edges: List[Node] =[]) -> graphviz.Digraph:
+def _turn_subgraph(dot: List[str], interactional_sequence: List[Node], node_names: Dict[Node, str],
+                   highlight_edges: Iterable[Node] = ()) -> None:
     """
-    Creates a subgraph that add the edges that connect the segments together
+    Writes a subgraph that add the edges that connect the segments together
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
     :param interactional_sequence: list of edges of the interactional sequence
     :type interactional_sequence: List[Node]
-    :param highlight_edges: list of edges that should be hightlighted
-    :type highlight_edges: List[Node]
-    :return: graphviz Digraph subgraph with edges between segments
-    :rtype: graphviz.Digraph
+    :param node_names: dictionary of nodes with their quoted name in the graph as value
+    :type node_names: Dict[Node, str]
+    :param highlight_edges: edges that should be hightlighted
+    :type highlight_edges: Iterable[Node]
+    :return: None
+    :rtype: None
     """
-    prompt_response_subgraph = graphviz.Digraph()
-    # Add prompt/response edges
-    for prompt, response in interactional_sequence:
-        color = 'black' if (prompt, response) not in highlight_edges else 'red'
-        penwidth = "1" if (prompt, response) not in highlight_edges else "4"
-        prompt_response_subgraph.edge(str(prompt), str(response), color=color, penwidth=penwidth)
-
-    return prompt_response_subgraph
-
-
-def _timeline_alignment_subgraphs(segment_onsets: List, actor_names: List[str]) -> graphviz.Digraph:
+    highlight_edges = frozenset(highlight_edges)
+    # Each edge is only written once, even if it appears several times in the interactional sequence (dictionaries
+    # are used as insertion-ordered sets)
+    interactional_sequence = dict.fromkeys(interactional_sequence)
+    # Bound methods of the templates (looked up once rather than for each edge)
+    edge_line, highlight_edge_line = EDGE.format, HIGHLIGHT_EDGE.format
+    _open_subgraph(dot)
+    # Add prompt/response edges (all the lines are built at once). Only highlighted edges need attributes
+    # (black edges of width 1 are graphviz's default)
+    if highlight_edges:
+        dot.extend([(highlight_edge_line if edge in highlight_edges else edge_line)(node_names[edge[0]],
+                                                                                    node_names[edge[1]])
+                    for edge in interactional_sequence])
+    else:
+        dot.extend([edge_line(node_names[prompt], node_names[response])
+                    for prompt, response in interactional_sequence])
+    _close_subgraph(dot)
+
+
+def _timeline_alignment_subgraphs(dot: List[str], segment_onsets: List, timeline_names: Dict[int, str],
+                                   actor_end_names: List[str]) -> None:
     """
-    Creates a subgraph that aligns all the segment nodes to their corresponding timeline node
-    :param segment_onsets: list of (index, onset) pairs of each node
-    :type segment_onsets: list of (index, onset) pairs
-    :param actor_names: name of the actors the segments belong to
-    :type actor_names: List[str]
-    :return: graphviz Digraph subgraph with alignment edges between timeline nodes and segment nodes
-    :rtype: graphviz.Digraph
+    Writes the groups of nodes of same rank that align all the segment nodes to their corresponding timeline node.
+    Each group is written as a single anonymous subgraph statement, i.e. `{rank=same; A; B;}`
+    :param dot: DOT source (list of lines)
+    :type dot: List[str]
+    :param segment_onsets: list of (name, onset) pairs of each node, sorted by onset
+    :type segment_onsets: list of (name, onset) pairs
+    :param timeline_names: dictionary of onsets with the quoted name of their timeline node as value
+    :type timeline_names: Dict[int, str]
+    :param actor_end_names: quoted name of the end nodes of the actors the segments belong to
+    :type actor_end_names: List[str]
+    :return: None
+    :rtype: None
     """
-    graphs = []
-
     # Align each speaker's node to the right timeline node
-    for index, onset in segment_onsets:
-        tl_segment_subgraph = graphviz.Digraph(graph_attr={'rank': 'same'})
-        tl_segment_subgraph.node(index)
-        tl_segment_subgraph.node(onset)
-        graphs.append(tl_segment_subgraph)
+    dot.extend(RANK_SAME_GROUP.format('{}; {}'.format(name, timeline_names[onset])) for name, onset in segment_onsets)
 
     # Align END_ and TLEND
-    tl_segment_subgraph = graphviz.Digraph(graph_attr={'rank': 'same'})
-    tl_segment_subgraph.node("TLEND")
-    for actor_name in actor_names:
-        tl_segment_subgraph.node('{}END'.format(actor_name))
-    graphs.append(tl_segment_subgraph)
+    dot.append(RANK_SAME_GROUP.format('; '.join([TIMELINE_END, *actor_end_names])))
+
 
-    return graphs
+class _StreamWriter(object):
+    """
+    Wraps a writable text stream so that the DOT source can be written to it with the same `append`/`extend` calls
+    as a list of lines
+    """
+    __slots__ = ('append', 'extend')
+
+    def __init__(self, out: TextIO):
+        self.append = out.write
+        self.extend = out.writelines
 
 
-def generate_interactional_sequence_visualisation(interactional_sequence: List[Node], highlight_edges: List[Node] = []):
+def _write_dot(dot, interactional_sequence: List[Node], highlight_edges: Iterable[Node],
+               timeline: Optional[Union[bool, int]], engine: Optional[str]) -> str:
     """
-    Generates the graph of an interactional sequence
+    Writes the DOT source of the graph of an interactional sequence line by line
+    :param dot: DOT source (list of lines, or any object with `append` and `extend` methods)
+    :type dot: Union[List[str], _StreamWriter]
     :param interactional_sequence: tuple of nodes
     :type interactional_sequence: List[Node]
     :param highlight_edges: tuple of nodes whose edges will be highlighted
-    :type highlight_edges: List[Node]
-    :return: graphviz Digraph object
-    :rtype: graphviz.Digraph
+    :type highlight_edges: Iterable[Node]
+    :param timeline: whether the segments should be aligned on a timeline (see
+    `generate_interactional_sequence_visualisation`)
+    :type timeline: Optional[Union[bool, int]]
+    :param engine: graphviz layout engine (see `generate_interactional_sequence_visualisation`)
+    :type engine: Optional[str]
+    :return: layout engine that should be used to render the graph
+    :rtype: str
     """
-    # Sort segments by onset
-    sorted_interaction_sequence_turns = sorted(interactional_sequence, key=lambda tup: tup[0].onset)
-    prompts, responses = zip(*sorted_interaction_sequence_turns)
+    # Single pass over the edges to get the prompts and the responses, the name of each node (computed once and
+    # reused by all the subgraphs), the timeline node of each node, and the nodes of each actor. The attributes of
+    # the nodes are only read once: the subgraphs then use (name, onset, id) tuples. Nodes are numbered locally
+    # (in order of appearance) as their indices are those of the user's data frame (which may be large, negative or
+    # not even integers)
+    prompts, responses = set(), set()
+    node_names, node_ids, segment_onsets, actors_name_segments = dict(), dict(), dict(), dict()
+    for prompt, response in interactional_sequence:
+        prompts.add(prompt)
+        responses.add(response)
+        for node in (prompt, response):
+            if node in node_names: continue
+            node_id, node_onset = len(node_ids), node.onset
+            node_name = quote(str(node.index))
+            node_names[node] = node_name
+            node_ids[node] = node_id
+            segment_onsets[node_name] = node_onset
+            actors_name_segments.setdefault(node.speaker, []).append((node_name, node_onset, node_id))
 
-    segment_onsets = set([(str(s.index), 'TL{}'.format(s.onset)) for s in prompts+responses])
-    segment_onsets = sorted(segment_onsets, key=lambda tup: int(tup[-1].replace('TL', '')))
+    # Sort segments by onset
+    segment_onsets = sorted(segment_onsets.items(), key=itemgetter(1))
+    # Name of the timeline node of each onset (formatted once, segments with the same onset share it)
+    timeline_names = {onset: _timeline_node(onset) for _, onset in segment_onsets}
+    for actor_segments in actors_name_segments.values():
+        actor_segments.sort(key=itemgetter(1))
+
+    # Name, group and end node of each actor (the names are sorted by actor once, to order the actor subgraph)
+    actor_names = {actor_name: quote(str(actor_name)) for actor_name in sorted(actors_name_segments)}
+    actor_groups = {actor_name: quote('GR{}'.format(actor_name)) for actor_name in actors_name_segments}
+    actor_end_names = {actor_name: quote('{}END'.format(actor_name)) for actor_name in actors_name_segments}
+
+    # Mark start nodes (prompts that are not responses) and end nodes (responses that are not prompts) directly,
+    # without building the set differences
+    node_types = bytearray(len(node_ids))
+    for node in prompts:
+        if node not in responses: node_types[node_ids[node]] = 1
+    for node in responses:
+        if node not in prompts: node_types[node_ids[node]] = 2
+
+    # Decide whether the timeline should be drawn
+    timeline = TIMELINE_MAX_SEGMENTS if timeline is None else timeline
+    with_timeline = timeline if isinstance(timeline, bool) else len(segment_onsets) <= timeline
+    large_graph = not with_timeline and not isinstance(timeline, bool)
+    if large_graph:
+        # A recording may contain many large interactional sequences: the message does not depend on the sequence,
+        # so that the default warning filter only shows it once
+        warnings.warn("interactional sequences with more than {} segments are drawn without timeline".format(timeline))
+
+    # Choose the layout engine (the faster engine is only used for large graphs, whose layout settings suit it)
+    if engine is None:
+        engine = (LARGE_GRAPH_ENGINE if large_graph and len(segment_onsets) > LARGE_GRAPH_MIN_SEGMENTS
+                  else DEFAULT_ENGINE)
 
-    actors_name_segments = get_actors(interactional_sequence)
+    # Graph
+    graph_attr = GRAPH_LARGE_ATTR if large_graph else GRAPH_ATTR if with_timeline else GRAPH_NO_TIMELINE_ATTR
+    dot.append('digraph {\n')
+    dot.append('\tgraph {}\n'.format(graph_attr))
 
-    # Get start and end nodes
-    start_nodes = set(prompts) - set(responses)  # all prompts that are not responses
-    end_nodes = set(responses) - set(prompts)    # all responses that are not prompts
+    _actor_subgraph(dot, actor_names)
+    if with_timeline:
+        _timeline_subgraph(dot, segment_onsets, timeline_names)
+    _segment_subgraphs(dot, actors_name_segments, node_types,
+                       actor_names, actor_groups, actor_end_names, clusters=not large_graph)
+    if with_timeline:
+        _timeline_alignment_subgraphs(dot, segment_onsets, timeline_names, actor_end_names.values())
+    _turn_subgraph(dot, interactional_sequence, node_names, highlight_edges=highlight_edges)
 
-    # Graph
-    graph = graphviz.Digraph(graph_attr={"rankdir": "LR", 'labeljust': 'l', "newrank": "true"})
+    dot.append('}\n')
 
-    actor_subgraph = _actor_subgraph(actors_name_segments.keys())
-    timeline_subgraph = _timeline_subgraph(segment_onsets)
-    segment_subgraphs = _segment_subgraphs(actors_name_segments, start_nodes, end_nodes)
-    timeline_alignment_subgraphs = _timeline_alignment_subgraphs(segment_onsets, actors_name_segments.keys())
+    return engine
 
-    graph.subgraph(actor_subgraph)
-    graph.subgraph(timeline_subgraph)
-    turn_subgraph = _turn_subgraph(interactional_sequence, highlight_edges=highlight_edges)
 
-    for segment_subgraph in segment_subgraphs:
-        graph.subgraph(segment_subgraph)
+def generate_interactional_sequence_visualisation(interactional_sequence: List[Node],
+                                                  highlight_edges: Iterable[Node] = (),
+                                                  timeline: Optional[Union[bool, int]] = None,
+                                                  engine: Optional[str] = None):
+    """
+    Generates the graph of an interactional sequence. The DOT source is written directly (rather than building
+    one graphviz object per subgraph) and wrapped in a graphviz Source object which can be rendered.
+    :param interactional_sequence: tuple of nodes
+    :type interactional_sequence: List[Node]
+    :param highlight_edges: tuple of nodes whose edges will be highlighted
+    :type highlight_edges: Iterable[Node]
+    :param timeline: whether the segments should be aligned on a timeline. If an integer is given, the timeline is
+    only drawn when the interactional sequence has at most this number of segments (the timeline roughly doubles the
+    number of nodes and edges, which makes the layout of large graphs very slow). Defaults to TIMELINE_MAX_SEGMENTS.
+    When the timeline is not drawn because the interactional sequence is too large, the actors are not drawn as
+    clusters and faster (but less precise) layout settings are used.
+    :type timeline: Optional[Union[bool, int]]
+    :param engine: graphviz layout engine used to render the graph. If None, DEFAULT_ENGINE is used, unless the
+    timeline is not drawn because the interactional sequence is too large and it has more than
+    LARGE_GRAPH_MIN_SEGMENTS segments, in which case LARGE_GRAPH_ENGINE (faster but less readable) is used.
+    :type engine: Optional[str]
+    :return: graphviz Source object
+    :rtype: graphviz.Source
+    """
+    dot = []
+    engine = _write_dot(dot, interactional_sequence, highlight_edges, timeline, engine)
 
-    for timeline_alignment_subgraph in timeline_alignment_subgraphs:
-        graph.subgraph(timeline_alignment_subgraph)
+    return graphviz.Source(''.join(dot), engine=engine)
 
-    graph.subgraph(turn_subgraph)
 
-    return graph
+def write_interactional_sequence_visualisation(out: TextIO,
+                                               interactional_sequence: List[Node],
+                                               highlight_edges: Iterable[Node] = (),
+                                               timeline: Optional[Union[bool, int]] = None,
+                                               engine: Optional[str] = None) -> str:
+    """
+    Writes the DOT source of the graph of an interactional sequence to a text stream (e.g. an opened .gv file)
+    fragment by fragment, without building the whole source in memory
+    :param out: writable text stream
+    :type out: TextIO
+    :param interactional_sequence: tuple of nodes
+    :type interactional_sequence: List[Node]
+    :param highlight_edges: tuple of nodes whose edges will be highlighted
+    :type highlight_edges: Iterable[Node]
+    :param timeline: whether the segments should be aligned on a timeline (see
+    `generate_interactional_sequence_visualisation`)
+    :type timeline: Optional[Union[bool, int]]
+    :param engine: graphviz layout engine (see `generate_interactional_sequence_visualisation`)
+    :type engine: Optional[str]
+    :return: layout engine that should be used to render the graph
+    :rtype: str
+    """
+    return _write_dot(_StreamWriter(out), interactional_sequence, highlight_edges, timeline, engine)
@@ -19,9 +19,10 @@
 # -----------------------------------------------------------------------------
 
 
+from functools import lru_cache
 from itertools import chain
 from operator import attrgetter
-from typing import List, Optional
+from typing import Callable, FrozenSet, Iterable, List, Optional, Tuple
 
 from .Graph import Cost, Node
 from .InteractionalSequence import InteractionalSequence
@@ -34,7 +35,7 @@ standard_columns = {"col_segment_speaker": "speaker_type",
 
 def standard_turn_transition_rules(candidate_node: Node, connected_node: Node,  # Obligatory argument
                                    target_participant: str,  # User-defined obligatory argument
-                                   interactants: Optional[List[str]] = None, allow_multi_unit_turns: bool = False,  # Optional arguments
+                                   interactants: Optional[Iterable[str]] = None, allow_multi_unit_turns: bool = False,  # Optional arguments
                                    allow_interactions_btw_interactants: bool = False, **kwargs) -> bool:
     """
     Returns whether the candidate node and the connected node should be considered as really connected or not.
@@ -47,8 +48,8 @@ def standard_turn_transition_rules(candidate_node: Node, connected_node: Node,
     ---- User-defined arguments----
     :param target_participant: which speaker should be considered the target participant
     :type target_participant: str
-    :param interactants: interactants to consider
-    :type interactants: List[str]
+    :param interactants: interactants to consider (`Conversation` stores them as a frozenset)
+    :type interactants: Optional[Iterable[str]]
     :param allow_multi_unit_turns: whether multi-turns unit be allowed
     :type allow_multi_unit_turns: bool
     :param allow_interactions_btw_interactants: whether interactants are allowed to interact between one another
@@ -58,19 +59,48 @@ def standard_turn_transition_rules(candidate_node: Node, connected_node: Node,
     :return: whether two segments should be considered connected or not
     :rtype: bool
     """
+    # The decision only depends on the speakers and the options: it is computed once for each combination
+    # (frozenset returns interactants as is when they already are a frozenset)
+    return _speakers_turn_transition(candidate_node.speaker, connected_node.speaker, target_participant,
+                                     frozenset(interactants) if interactants else None,
+                                     allow_multi_unit_turns, allow_interactions_btw_interactants)
+
+
+@lru_cache(maxsize=None)
+def _speakers_turn_transition(candidate_speaker: str, connected_speaker: str, target_participant: str,
+                              interactants: Optional[FrozenSet[str]], allow_multi_unit_turns: bool,
+                              allow_interactions_btw_interactants: bool) -> bool:
+    """
+    Returns whether a turn transition from a candidate speaker to a connected speaker is allowed
+    (see `standard_turn_transition_rules`)
+    :param candidate_speaker: speaker of the candidate segment
+    :type candidate_speaker: str
+    :param connected_speaker: speaker of the connected segment
+    :type connected_speaker: str
+    :param target_participant: which speaker should be considered the target participant
+    :type target_participant: str
+    :param interactants: interactants to consider
+    :type interactants: Optional[FrozenSet[str]]
+    :param allow_multi_unit_turns: whether multi-turns unit be allowed
+    :type allow_multi_unit_turns: bool
+    :param allow_interactions_btw_interactants: whether interactants are allowed to interact between one another
+    :type allow_interactions_btw_interactants: bool
+    :return: whether the turn transition is allowed
+    :rtype: bool
+    """
     # Rules
     if interactants:
-        if candidate_node.speaker == target_participant and connected_node.speaker in interactants:
+        if candidate_speaker == target_participant and connected_speaker in interactants:
             return True
-        if candidate_node.speaker in interactants and connected_node.speaker == target_participant:
+        if candidate_speaker in interactants and connected_speaker == target_participant:
             return True
         if allow_interactions_btw_interactants:
-            if candidate_node.speaker in interactants and connected_node.speaker in interactants and \
-                    candidate_node.speaker != connected_node.speaker:
+            if candidate_speaker in interactants and connected_speaker in interactants and \
+                    candidate_speaker != connected_speaker:
                 # Will require filtering to remove chains that do not include tgt_participant
                 return True
     else:
-        if candidate_node.speaker == target_participant or connected_node.speaker == target_participant:
+        if candidate_speaker == target_participant or connected_speaker == target_participant:
             return True
 
         # Allow interactions between everyone
@@ -79,7 +109,7 @@ def standard_turn_transition_rules(candidate_node: Node, connected_node: Node,
 
     if allow_multi_unit_turns:
         # Will require filtering to remove chains that do not include tgt_participant
-        if candidate_node.speaker == connected_node.speaker:
+        if candidate_speaker == connected_speaker:
             return True
 
     return False
@@ -98,21 +128,42 @@ def standard_filtering_rules(chain_sequences: List[InteractionalSequence], targe
     :rtype: List[InteractionalSequence]
     """
     # If allow_multi_unit_turns, filter out chains that do not include the tgt_participant
-    chain_sequences = list(filter(
-        lambda turns: any([segment.speaker == target_participant for segment in chain(*turns)]), chain_sequences))
+    chain_sequences = [turns for turns in chain_sequences
+                       if any(segment.speaker == target_participant for segment in chain.from_iterable(turns))]
 
     return chain_sequences
 
 
+@lru_cache(maxsize=None)
+def make_path_selector(selection_key: Tuple[str, ...]) -> Callable:
+    """
+    Returns a function that selects the best Cost of a list of Cost according to the given keys. Selectors are
+    cached so that the keys are only parsed once for a given selection key. The returned function can be used
+    directly as `best_path_selection_rules`.
+    :param selection_key: attributes of the Cost used to compare paths (most important first)
+    :type selection_key: Tuple[str, ...]
+    :return: function taking a list of costs and returning the best one (or the list itself if it is empty)
+    :rtype: Callable
+    """
+    key = attrgetter(*selection_key)
+
+    def select_best_path(path_list: List[Cost], **kwargs):
+        if not path_list: return path_list
+        return max(path_list, key=key)
+
+    return select_best_path
+
+
 def standard_path_selection_rules(path_list: List[Cost], selection_key: List[str], **kwargs):
     """
-    Sorts a list of Cost and return the best
+    Returns the best Cost of a list of Cost
     :param path_list: list of costs
     :type path_list: Cost
+    :param selection_key: attributes of the Cost used to compare paths (most important first)
+    :type selection_key: List[str]
     :param kwargs: other user-defined keyword arguments not used in this function
     :type kwargs: dict
     :return: best cost (as defined by the sorting function and the keys used)
     :rtype: Cost
     """
-    if not path_list: return path_list
-    return sorted(path_list, reverse=True, key=attrgetter(*selection_key))[0]
+    return make_path_selector(tuple(selection_key))(path_list)
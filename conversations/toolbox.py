@@ -58,9 +58,8 @@ def get_turn_transitions_between_pair(df: pd.DataFrame, speakers: List, speaker_
     # Convert strings to pandas Int32 (/!\ not np.int32)
     segs = segs.astype({'is_response_to': 'Int32', 'is_prompt_to': 'Int32'})
 
-    # Get all prompts and responses
-    all_prompt_responses = list(segs[segs['is_response_to'].notnull()]['is_response_to']) + \
-                           list(segs[segs['is_prompt_to'].notnull()]['is_prompt_to'])
+    # Get all prompts and responses (unique values, computed in a single vectorised pass)
+    all_prompt_responses = pd.concat([segs['is_response_to'], segs['is_prompt_to']]).dropna().unique()
 
     # Keep segments that are prompts are responses, and that are in the df
     turns = segs[segs['unit_index'].isin(all_prompt_responses) &
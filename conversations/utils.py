@@ -18,7 +18,7 @@
 #       • Utility functions
 # -----------------------------------------------------------------------------
 
-from typing import Iterable
+from typing import Iterable, Iterator
 from itertools import chain, tee
 
 
@@ -54,7 +54,21 @@ def overlap(onset: float, offset: float, target_onset: float, target_offset: flo
 
 
 def overlaps(onset: float, offset: float, target_onset: float, target_offset: float) -> bool:
-
+    """
+    Returns whether a segment starting at onset and finishing at offset overlaps with another segment starting at
+    target_onset and finishing at target_offset. Kept as public API: connected nodes are found with array operations
+    (see `Conversation._find_connected_nodes`) and do not use this function
+    :param onset: onset of the first segment
+    :type onset: float
+    :param offset: offset of the first segment
+    :type offset: float
+    :param target_onset: onset of the second segment
+    :type target_onset: float
+    :param target_offset: offset of the second segment
+    :type target_offset: float
+    :return: True if the segments overlap
+    :rtype: bool
+    """
     return bool(overlap(onset, offset, target_onset, target_offset))
 
 
@@ -67,4 +81,16 @@ def flatten(iterable: Iterable) -> list:
     :return: flattened iterable
     :rtype: list
     """
-    return list(chain(*iterable))
+    return list(chain.from_iterable(iterable))
+
+
+def iflatten(iterable: Iterable) -> Iterator:
+    """
+    Lazily flattens an iterable (use it rather than `flatten` when the result is only iterated over)
+    [['a', 'b'], ['c', 'd']] -> 'a', 'b', 'c', 'd'
+    :param iterable: iterable
+    :type iterable: Iterable
+    :return: iterator over the flattened iterable
+    :rtype: Iterator
+    """
+    return chain.from_iterable(iterable)
@@ -19,8 +19,12 @@
 # -----------------------------------------------------------------------------
 
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from glob import glob
 
+import pandas as pd
+
 from conversations import Conversation
 from conversations.standards import (
     standard_filtering_rules,
@@ -29,6 +33,52 @@ from conversations.standards import (
     standard_columns
 )
 
+# Interactional sequences of all the files are saved in a single CSV file (set to True to also save one CSV file
+# for each input file)
+PER_FILE_CSV = False
+
+
+def process_file(filepath, conversation, plot_path, csv_path=None):
+    """
+    Finds the interactional sequences of a CSV file and plots each of them (runs in a worker process)
+    :param filepath: path to the CSV file to be processed
+    :type filepath: str
+    :param conversation: conversation settings used to find the interactional sequences
+    :type conversation: Conversation
+    :param plot_path: directory where the graphs of the interactional sequences are rendered
+    :type plot_path: str
+    :param csv_path: directory where the interactional sequences of this file are saved on their own. If None, they
+    are not saved (they are only returned)
+    :type csv_path: Optional[str]
+    :return: number of interactional sequences found and data frame of the interactional sequences (with a
+    `source_file` column)
+    :rtype: Tuple[int, pd.DataFrame]
+    """
+    file = os.path.basename(filepath)
+
+    # Load the data
+    data = Conversation.from_csv(filepath)  # Empty lines are removed
+
+    # Retrieve interactional sequences
+    interactional_sequences = conversation.get_interactional_sequences(data)
+
+    # Iterate over all interactional sequences found
+    for idx, interactional_sequence in enumerate(interactional_sequences):
+        # And plot a graph representing the interactional sequence!
+        interactional_sequence.render(dirpath=plot_path,
+                                      name="{}_{}".format(file, idx),
+                                      format='png',
+                                      delete_gv=False,
+                                      raw_with_best_path=False,
+                                      use_cache=True)
+
+    # Optionally, save the interactional sequences of this file on their own
+    if csv_path:
+        output_fn = '{}_interactional_sequences.csv'.format(os.path.splitext(file)[0])
+        interactional_sequences.to_csv(os.path.join(csv_path, output_fn))
+
+    return len(interactional_sequences), interactional_sequences.to_dataframe().assign(source_file=file)
+
 
 def main():
     root_path = os.path.join(os.path.abspath(os.path.dirname(__file__)))
@@ -38,7 +88,7 @@ def main():
     os.makedirs(plot_path, exist_ok=True)
     os.makedirs(csv_path, exist_ok=True)
 
-    files = [f for f in os.listdir(root_path) if f.endswith('.csv')]
+    files = [entry.path for entry in os.scandir(root_path) if entry.is_file() and entry.name.endswith('.csv')]
 
     # Define what a conversation is
     conversation = Conversation(**standard_columns,
@@ -59,28 +109,16 @@ def main():
                                     # Filter out interactional sequences
                                 filtering_rules=standard_filtering_rules,)
 
-    for file in files:
-        print(file)
-
-        # Load the data
-        data = Conversation.from_csv(os.path.join(root_path, file))
-        data = data[~data['speaker_type'].isnull()]  # Remove empty lines
+    # Files are independent from each other and are processed in parallel
+    process = partial(process_file, conversation=conversation, plot_path=plot_path,
+                      csv_path=csv_path if PER_FILE_CSV else None)
+    all_interactional_sequences = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for filepath, (num_sequences, interactional_sequences) in zip(files, executor.map(process, files)):
+            print('{}: plotted {} interactional sequences'.format(os.path.basename(filepath), num_sequences))
+            all_interactional_sequences.append(interactional_sequences)
 
-        # Retrieve interactional sequences
-        interactional_sequences = conversation.get_interactional_sequences(data)
-
-        # Iterate over all interactional sequences found
-        for idx, interactional_sequence in enumerate(interactional_sequences):
-            # And plot a graph representing the interactional sequence!
-            interactional_sequence.render(dirpath=plot_path,
-                                          name="{}_{}".format(file, idx),
-                                          format='png',
-                                          delete_gv=False,
-                                          raw_with_best_path=False)
-            print('\tPlotted interactional sequence #{}'.format(idx))
-
-        output_fn = '{}_interactional_sequences.csv'.format(os.path.splitext(file)[0])
-        interactional_sequences.to_csv(os.path.join(csv_path, output_fn))
+    pd.concat(all_interactional_sequences).to_csv(os.path.join(csv_path, 'interactional_sequences.csv'), index=False)
 
 
 if __name__ == '__main__':
@@ -5,31 +5,43 @@ Created on Wed Jul 27 12:27:24 2022
 
 @author: lpeurey
 """
+import os
 import pandas as pd
 import random
 import numpy as np
 import time
 
 from conversations.conversations import Conversation
+from conversations.standards import standard_columns
 
-np.random.seed(2424) #usage of a seed allows for consistency in generated dataframes
-onsets = np.random.randint(10e5, size=1000) #generate random onsets, maximum being 10e5 (so this represents an audio of ~1000s so around 17min)
-durations = np.random.randint(10e3, size=1000) #generate random durations, meximum duration being 10s
+#cache of the generated segments (not versioned, it is written by the first run from the seeded generator below)
+BENCH_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bench_segments.npy')
 
-offsets = onsets + durations
+def generate_bench_data(path):
+    np.random.seed(2424) #usage of a seed allows for consistency in generated dataframes
+    onsets = np.random.randint(10e5, size=1000) #generate random onsets, maximum being 10e5 (so this represents an audio of ~1000s so around 17min)
+    durations = np.random.randint(10e3, size=1000) #generate random durations, meximum duration being 10s
 
-segments = pd.DataFrame({'segment_onset': onsets,
-                        'segment_offset':offsets,
-                        })
-segments['name']= segments.index
-segments['speaker_type']= 'CHI'
+    offsets = onsets + durations
+    np.save(path, np.stack([onsets, offsets]))
 
-segments.sort_values('segment_onset', inplace=True)
+if __name__ == '__main__':
+    #the random segments are generated once and cached so that successive runs time the exact same data
+    if not os.path.exists(BENCH_DATA): generate_bench_data(BENCH_DATA)
+    onsets, offsets = np.load(BENCH_DATA, mmap_mode='r')
 
-cv = Conversation(allow_segment_jump=True)
+    segments = pd.DataFrame({'segment_onset': onsets,
+                            'segment_offset':offsets,
+                            })
+    segments['name']= segments.index
+    segments['speaker_type']= 'CHI'
 
-start = time.time()
-connected_nodes = cv._find_connected_nodes(segments)
-stop = time.time()
+    segments.sort_values('segment_onset', inplace=True)
 
-print("finding connected nodes took {}s".format(stop - start))
\ No newline at end of file
+    cv = Conversation(**standard_columns, allow_segment_jump=True)
+
+    start = time.time()
+    connected_nodes = cv._find_connected_nodes(segments)
+    stop = time.time()
+
+    print("finding connected nodes took {}s".format(stop - start))
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares Conversation._find_connected_nodes with a brute-force reference implementation
+"""
+from conversations import Conversation
+from conversations.standards import standard_columns
+from conversations.utils import overlaps
+
+import numpy as np
+import pytest
+import pandas as pd
+
+
+def reference_connected_nodes(segments, allowed_gap, allow_segment_jump):
+    """
+    Brute-force reference: compares every pair of segments (same rules as the original row by row implementation)
+    """
+    rows = list(segments[['segment_onset', 'segment_offset', 'speaker_type']].itertuples())
+    connected_nodes = []
+    for t_index, t_onset, t_offset, _ in rows:
+        # Candidates overlapping the target (with the allowed gap), starting strictly after it, in their original order
+        candidates = [(position, c_index, c_onset, c_speaker)
+                      for position, (c_index, c_onset, c_offset, c_speaker) in enumerate(rows)
+                      if overlaps(c_onset, c_offset, t_onset, t_offset + allowed_gap)
+                      and c_onset > t_onset and c_index != t_index]
+        if not allow_segment_jump:
+            # Keep only the first segment of each speaker (speakers in sorted order, missing speakers are dropped)
+            first = {}
+            for position, c_index, c_onset, c_speaker in candidates:
+                if pd.isna(c_speaker):
+                    continue
+                if c_speaker not in first or (c_onset, position) < first[c_speaker][:2]:
+                    first[c_speaker] = (c_onset, position, c_index)
+            candidates = [(position, c_index, c_onset, c_speaker)
+                          for c_speaker, (c_onset, position, c_index) in sorted(first.items())]
+        connected_nodes.append([c_index for _, c_index, _, _ in candidates])
+    return connected_nodes
+
+
+def random_segments(seed, n, sort, index):
+    rng = np.random.RandomState(seed)
+    onsets = rng.randint(0, 20 * n + 10, size=n)
+    # Some segments have a duration of zero
+    durations = rng.randint(0, 200, size=n) * rng.randint(0, 2, size=n)
+    segments = pd.DataFrame({'segment_onset': onsets,
+                             'segment_offset': onsets + durations,
+                             'speaker_type': rng.choice(['CHI', 'FEM', 'MAL', None], size=n)})
+    if sort:
+        segments = segments.sort_values('segment_onset')
+    if index == 'permuted':
+        segments.index = rng.permutation(n) * 3 + 7
+    elif index == 'string':
+        segments.index = ['seg_{}'.format(i) for i in rng.permutation(n)]
+    return segments
+
+
+@pytest.mark.parametrize("allow_segment_jump", [True, False])
+@pytest.mark.parametrize("allowed_gap", [0, 50, 1000])
+@pytest.mark.parametrize("sort", [True, False])
+@pytest.mark.parametrize("index", ['default', 'permuted', 'string'])
+@pytest.mark.parametrize("n", [0, 1, 10, 200])
+def test_connected_nodes_random(n, index, sort, allowed_gap, allow_segment_jump):
+    segments = random_segments(n, n, sort, index)
+    conv = Conversation(**standard_columns, allowed_gap=allowed_gap, allow_segment_jump=allow_segment_jump)
+
+    res = conv._find_connected_nodes(segments.copy())
+
+    assert list(res.index) == list(segments.index)
+    assert list(res['connected_nodes']) == reference_connected_nodes(segments, allowed_gap, allow_segment_jump)
+
+
+@pytest.mark.parametrize("allow_segment_jump", [True, False])
+def test_connected_nodes_edge_cases(allow_segment_jump):
+    # Unsorted, non integer index, zero duration segments (never connected to), missing speaker, same onsets
+    segments = pd.DataFrame({'segment_onset':  [500, 0, 100, 100, 300, 300, 1200, 150],
+                             'segment_offset': [900, 200, 100, 400, 600, 350, 1300, 250],
+                             'speaker_type': ['FEM', 'CHI', 'FEM', np.nan, 'FEM', 'MAL', 'CHI', 'FEM']},
+                            index=['e', 'a', 'b', 'c', 'f', 'g', 'h', 'd'])
+    conv = Conversation(**standard_columns, allowed_gap=100, allow_segment_jump=allow_segment_jump)
+
+    res = conv._find_connected_nodes(segments.copy())
+
+    expected = reference_connected_nodes(segments, 100, allow_segment_jump)
+    assert list(res['connected_nodes']) == expected
+    # 'b' has a duration of zero: it is never connected to, and 'c' has no speaker: it is only kept with jumps
+    assert not any('b' in nodes for nodes in expected)
+    assert any('c' in nodes for nodes in expected) == allow_segment_jump
@@ -6,7 +6,7 @@ Created on Thu Aug  4 12:57:39 2022
 @author: lpeurey
 """
 from conversations import Conversation
-from conversations.conversations import COLUMNS_REQUIRED
+from conversations.standards import standard_columns
 
 from collections import defaultdict
 import pytest
@@ -18,23 +18,41 @@ RTTM_INPUT = 'tests/data/example.rttm'
 ITS_INPUT = 'tests/data/example_lena_new.its'
 EMPTY_FILE = 'tests/data/empty_file'
 
+# columns every imported segment must have (rows missing one of them are not segments)
+COLUMNS_REQUIRED = list(standard_columns.values())
+
 @pytest.fixture()
 def conv():
-    return Conversation()
+    return Conversation(**standard_columns)
+
+# truth files are read once for the whole session and shared by all the parametrized cases (tests must not modify
+# them in place). They have a default index, like the results they are compared to (reset once in each test)
+@pytest.fixture(scope="session")
+def truth_csv():
+    return pd.read_csv('tests/truth/df-csv.csv')
+
+@pytest.fixture(scope="session")
+def truth_rttm():
+    truth = pd.read_csv('tests/truth/df-rttm.csv', dtype={'file': 'string', 'name': 'string', 'speaker_type': 'string'})
+    return truth.dropna(subset=COLUMNS_REQUIRED).reset_index(drop=True)
+
+@pytest.fixture(scope="session")
+def truth_its():
+    return pd.read_csv('tests/truth/df-its.csv')
 
 @pytest.mark.parametrize("file,test", [
        (CSV_INPUT,'correct'),
        (EMPTY_FILE,'empty'),])
-def test_import_csv(conv, file, test):
+def test_import_csv(conv, truth_csv, file, test):
     caught = False
     try:
-        res = conv.from_csv(file)
+        res = conv.from_csv(file).reset_index(drop=True)
     except Exception as e:
         caught = True    
-    truth = pd.read_csv('tests/truth/df-csv.csv')
+    truth = truth_csv
     if test == 'correct':
         #res.to_csv('tests/truth/2df-csv.csv', index=False) ###TMP
-        pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.reset_index(drop=True), check_like=True)
+        pd.testing.assert_frame_equal(res, truth, check_like=True)
     elif test == 'empty' : assert caught
     else : raise NotImplementedError('this test is not captured')
 
@@ -51,30 +69,46 @@ RTTM_MAP = (defaultdict(lambda: pd.NA,
        (None,RTTM_INPUT,'namibie_aiku_20160714_1', 'source_file'),
        (RTTM_MAP,RTTM_INPUT,'namibie_aiku_20160714_1', 'source_and_map'),
        (None,EMPTY_FILE,None,'empty')])
-def test_import_rttm(conv,mapg,file,source,test):
+def test_import_rttm(conv,truth_rttm,mapg,file,source,test):
     caught = False
     try:
-        res = conv.from_rttm(file, mapg, source)
+        res = conv.from_rttm(file, mapg, source).reset_index(drop=True)
     except Exception as e:
         caught = True
     
-    truth = pd.read_csv('tests/truth/df-rttm.csv')
-    truth.dropna(subset=COLUMNS_REQUIRED, inplace=True)
+    truth = truth_rttm
     truth_mapped = truth.copy()
     truth_mapped.speaker_type = truth_mapped.speaker_type.map(RTTM_MAP)
-    truth_mapped.dropna(subset=COLUMNS_REQUIRED, inplace=True)
+    truth_mapped = truth_mapped.dropna(subset=COLUMNS_REQUIRED).reset_index(drop=True)
     
     if test == "mapping":
-        pd.testing.assert_frame_equal(res.reset_index(drop=True), truth_mapped.reset_index(drop=True), check_like=True)
+        pd.testing.assert_frame_equal(res, truth_mapped, check_like=True)
     elif test == "vanilla": 
         res.to_csv('tests/truth/2df-rttm.csv', index=False) ###TMP
-        pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.reset_index(drop=True), check_like=True)
+        pd.testing.assert_frame_equal(res, truth, check_like=True)
     elif test == "no-dict" : assert caught
-    elif test == 'source_file' : pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.head(5).reset_index(drop=True), check_like=True)
-    elif test == 'source_and_map' : pd.testing.assert_frame_equal(res.reset_index(drop=True), truth_mapped.head(3).reset_index(drop=True), check_like=True)
-    elif test == 'empty' : pd.testing.assert_frame_equal(res.reset_index(drop=True), pd.DataFrame(columns=['type', 'file', 'chnl', 'tbeg', 'tdur', 'ortho', 'stype', 'name','conf', 'slat', 'segment_onset', 'segment_offset', 'speaker_type']).reset_index(drop=True), check_like=True, check_dtype=False)
+    elif test == 'source_file' : pd.testing.assert_frame_equal(res, truth.head(5), check_like=True)
+    elif test == 'source_and_map' : pd.testing.assert_frame_equal(res, truth_mapped.head(3), check_like=True)
+    elif test == 'empty' : pd.testing.assert_frame_equal(res, pd.DataFrame(columns=['file', 'tbeg', 'tdur', 'name', 'segment_onset', 'segment_offset', 'speaker_type']), check_like=True, check_dtype=False)
     else : raise NotImplementedError('this test is not captured')
 
+# from_rttm only reads the file, tbeg, tdur and name fields of the RTTM (type, chnl, ortho, stype, conf and slat are
+# dropped), file and name are read as strings
+RTTM_COLUMNS = ['file', 'tbeg', 'tdur', 'name', 'segment_onset', 'segment_offset', 'speaker_type']
+
+@pytest.mark.parametrize("mapg", [None, RTTM_MAP])
+def test_import_rttm_schema(conv, mapg):
+    res = conv.from_rttm(RTTM_INPUT, mapg)
+
+    assert list(res.columns) == RTTM_COLUMNS
+    assert res['file'].dtype == 'string'
+    assert res['name'].dtype == 'string'
+    assert res['tbeg'].dtype == 'float64'
+    assert res['tdur'].dtype == 'float64'
+    assert pd.api.types.is_integer_dtype(res['segment_onset'])
+    assert pd.api.types.is_integer_dtype(res['segment_offset'])
+    assert not res['speaker_type'].isna().any()
+
 
 ITS_MAP = defaultdict(
         lambda: pd.NA, {"CHN": "CHI", "CXN": "OCH", "FAN": "FEM", "MAN": "MAL"}
@@ -87,37 +121,37 @@ ITS_MAP = defaultdict(
        (None,ITS_INPUT,1, 'source_file'),
        (ITS_MAP,ITS_INPUT,2, 'source_and_map'),
        (None,EMPTY_FILE,None,'empty')])  
-def test_import_its(conv,mapg,file,source,test):
+def test_import_its(conv,truth_its,mapg,file,source,test):
     caught = False
     try:
-        res = conv.from_its(file, mapg, source)
+        res = conv.from_its(file, mapg, source).reset_index(drop=True)
     except Exception as e:
         caught = True
         
-    truth = pd.read_csv('tests/truth/df-its.csv')
+    truth = truth_its
     truth_mapped = truth.copy()
     truth_mapped.speaker_type = truth_mapped.speaker_type.map(ITS_MAP)
-    truth_mapped.dropna(inplace=True)
+    truth_mapped = truth_mapped.dropna().reset_index(drop=True)
     
-    if test == "mapping": pd.testing.assert_frame_equal(res.reset_index(drop=True), truth_mapped.reset_index(drop=True), check_like=True)
-    elif test == "vanilla": pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.reset_index(drop=True), check_like=True)
+    if test == "mapping": pd.testing.assert_frame_equal(res, truth_mapped, check_like=True)
+    elif test == "vanilla": pd.testing.assert_frame_equal(res, truth, check_like=True)
     elif test == "no-dict" : assert caught
-    elif test == 'source_file' : pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.head(23289).reset_index(drop=True), check_like=True)
-    elif test == 'source_and_map' : pd.testing.assert_frame_equal(res.reset_index(drop=True), pd.DataFrame(columns=['segment_onset','segment_offset', 'speaker_type']).reset_index(drop=True), check_like=True)
+    elif test == 'source_file' : pd.testing.assert_frame_equal(res, truth.head(23289), check_like=True)
+    elif test == 'source_and_map' : pd.testing.assert_frame_equal(res, pd.DataFrame(columns=['segment_onset','segment_offset', 'speaker_type']), check_like=True)
     elif test == 'empty' : assert caught
     else : raise NotImplementedError('this test is not captured')
     
 @pytest.mark.parametrize("file,test", [
        (TXT_INPUT,'correct'),
        (EMPTY_FILE,'empty'),])
-def test_import_txt(conv, file, test):
+def test_import_txt(conv, truth_csv, file, test):
     caught = False
     try:
-        res = conv.from_txt(file)
+        res = conv.from_txt(file).reset_index(drop=True)
     except Exception as e:
         caught = True    
-    truth = pd.read_csv('tests/truth/df-csv.csv')
+    truth = truth_csv
     #res.to_csv('tests/truth/df-csv.csv',index=False)
-    if test == 'correct': pd.testing.assert_frame_equal(res.reset_index(drop=True), truth.reset_index(drop=True), check_like=True)
+    if test == 'correct': pd.testing.assert_frame_equal(res, truth, check_like=True)
     elif test == 'empty' : assert caught
     else : raise NotImplementedError('this test is not captured')
\ No newline at end of file
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of PathCost (paths starting from the same segment share their speaker to bit mapping)
+"""
+from conversations.PathCost import PathCost
+from conversations.Segment import Segment
+
+
+def test_branching_paths_num_speakers():
+    root = PathCost(Segment(0, 'CHI', 0, 100))
+
+    # Two paths branch from the same root and each meets a different new speaker
+    fem = root + Segment(1, 'FEM', 200, 300)
+    mal = root + Segment(2, 'MAL', 200, 300)
+    assert root.num_speakers == 1
+    assert fem.num_speakers == 2
+    assert mal.num_speakers == 2
+
+    # Speakers already met by the other branch are still new to this one
+    fem_mal = fem + Segment(3, 'MAL', 400, 500)
+    mal_och = mal + Segment(4, 'OCH', 400, 500)
+    mal_chi = mal + Segment(5, 'CHI', 400, 500)
+    assert fem_mal.num_speakers == 3
+    assert mal_och.num_speakers == 3
+    assert mal_chi.num_speakers == 2
+    assert (fem + Segment(6, 'FEM', 400, 500)).num_speakers == 2
+    assert (mal_och + Segment(7, 'FEM', 600, 700)).num_speakers == 4
+
+    # Extending the paths does not modify the paths they come from
+    assert (root.num_speakers, fem.num_speakers, mal.num_speakers) == (1, 2, 2)
+    assert (fem_mal.num_segments, fem_mal.num_turn_transitions, fem_mal.num_multi_turns_transitions) == (3, 2, 0)
+    assert fem_mal.ancestor is root.ancestor
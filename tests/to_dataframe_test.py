@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Golden test of InteractionalSequences.to_dataframe on egs/example_23.csv
+"""
+from conversations import Conversation
+from conversations.conversations import InteractionalSequences
+from conversations.Graph import DirectedGraph
+from conversations.InteractionalSequence import InteractionalSequence
+from conversations.standards import (standard_columns, standard_filtering_rules, standard_turn_transition_rules,
+                                     standard_path_selection_rules)
+
+import pytest
+import pandas as pd
+
+CSV_INPUT = 'egs/example_23.csv'
+# inter_seq_index and conv_turn_index of the segments for the sequences found in CSV_INPUT, followed by a third
+# sequence made of the last edge of the first sequence and the first edge of the second one
+TRUTH = 'tests/truth/df-inter-seq.csv'
+COLUMNS = ['segment_onset', 'speaker_type', 'inter_seq_index', 'conv_turn_index']
+
+@pytest.fixture(scope="module")
+def interactional_sequences():
+    conv = Conversation(**standard_columns,
+                        target_participant='CHI',
+                        allowed_gap=1000,
+                        allow_segment_jump=False,
+                        allow_multi_unit_turns=True,
+                        allow_interactions_btw_interactants=True,
+                        selection_key=['num_turns', 'num_multi_turns_transitions'],
+                        turn_transition_rules=standard_turn_transition_rules,
+                        best_path_selection_rules=standard_path_selection_rules,
+                        filtering_rules=standard_filtering_rules)
+    return conv.get_interactional_sequences(Conversation.from_csv(CSV_INPUT))
+
+@pytest.fixture(scope="module")
+def truth():
+    return pd.read_csv(TRUTH, index_col='index', dtype={'inter_seq_index': str,
+                                                       'conv_turn_index': str})
+
+def test_to_dataframe(interactional_sequences, truth):
+    res = interactional_sequences.to_dataframe()
+
+    # Each segment belongs to at most one of the sequences found
+    expected = truth.copy()
+    expected['inter_seq_index'] = expected['inter_seq_index'].str.replace(r';.*', '', regex=True)
+    expected['conv_turn_index'] = expected['conv_turn_index'].str.replace(r',.*', '', regex=True)
+    pd.testing.assert_frame_equal(res[COLUMNS], expected, check_names=False)
+
+def test_to_dataframe_shared_segments(interactional_sequences, truth):
+    sequences = list(interactional_sequences.interactional_sequences)
+    shared = InteractionalSequence(DirectedGraph.from_tuple_list(list(sequences[0])[-1:] + list(sequences[1])[:1]))
+    res = InteractionalSequences(data=interactional_sequences._data,
+                                 interactional_sequences=sequences + [shared]).to_dataframe()
+
+    pd.testing.assert_frame_equal(res[COLUMNS], truth, check_names=False)
+    # Segments belonging to several sequences list the sequences (separated by ';') and their rank in each of them
+    assert res.loc[27, 'inter_seq_index'] == '1;3' and res.loc[27, 'conv_turn_index'] == '19,1'
+    assert res.loc[30, 'inter_seq_index'] == '2;3' and res.loc[30, 'conv_turn_index'] == '2,4'